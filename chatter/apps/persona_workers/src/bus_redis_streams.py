@@ -1,6 +1,6 @@
 import asyncio
 import logging
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import redis.asyncio as redis
 from redis.exceptions import ConnectionError as RedisConnectionError
@@ -9,8 +9,10 @@ from redis.exceptions import ResponseError
 logger = logging.getLogger(__name__)
 
 
-async def connect(redis_url: str) -> redis.Redis:
-    client = redis.from_url(redis_url, decode_responses=True)
+async def connect(redis_url: str, max_connections: Optional[int] = None) -> redis.Redis:
+    # from_url backs the client with a ConnectionPool; blocking reads and publish pipelines
+    # each check out their own connection, so the cap must leave room for both read loops.
+    client = redis.from_url(redis_url, decode_responses=True, max_connections=max_connections)
     await client.ping()
     return client
 
@@ -26,13 +28,21 @@ async def ensure_consumer_group(client: redis.Redis, stream: str, group: str) ->
 
 
 async def read_messages(
-    client: redis.Redis, stream: str, group: str, consumer_name: str, count: int = 10, block_ms: int = 1000
+    client: redis.Redis,
+    stream: str,
+    group: str,
+    consumer_name: str,
+    count: int = 10,
+    block_ms: Optional[int] = 1000,
+    ack_delete: bool = False,
+    start_id: str = ">",
 ) -> List[Tuple[str, str]]:
+    # start_id ">" reads new entries; any other id re-reads this consumer's pending entries after it.
     try:
         records = await client.xreadgroup(
             groupname=group,
             consumername=consumer_name,
-            streams={stream: ">"},
+            streams={stream: start_id},
             count=count,
             block=block_ms,
         )
@@ -45,18 +55,26 @@ async def read_messages(
     if not records:
         return []
     messages: List[Tuple[str, str]] = []
+    unusable: List[str] = []
     for _stream, entries in records:
         for redis_id, fields in entries:
-            raw = fields.get("data")
+            # Pending entries trimmed from the stream come back without fields.
+            raw = fields.get("data") if fields else None
             if isinstance(raw, bytes):
                 try:
                     raw = raw.decode("utf-8")
                 except Exception:  # noqa: BLE001
                     raw = None
             if not isinstance(raw, str):
-                await ack(client, stream, group, redis_id)
+                unusable.append(redis_id)
                 continue
             messages.append((redis_id, raw))
+    # Entries without a data payload can never be handled; drop them from the PEL in one call,
+    # deleting them too when the caller trims acked entries with XACKDEL.
+    if ack_delete:
+        await ack_and_delete(client, stream, group, unusable)
+    else:
+        await ack_many(client, stream, group, unusable)
     return messages
 
 
@@ -65,3 +83,21 @@ async def ack(client: redis.Redis, stream: str, group: str, redis_id: str) -> No
         await client.xack(stream, group, redis_id)
     except Exception as exc:  # noqa: BLE001
         logger.warning("Failed to ack %s: %s", redis_id, exc)
+
+
+async def ack_many(client: redis.Redis, stream: str, group: str, redis_ids: List[str]) -> None:
+    if not redis_ids:
+        return
+    try:
+        await client.xack(stream, group, *redis_ids)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Failed to ack %s: %s", redis_ids, exc)
+
+
+async def ack_and_delete(client: redis.Redis, stream: str, group: str, redis_ids: List[str]) -> None:
+    if not redis_ids:
+        return
+    try:
+        await client.execute_command("XACKDEL", stream, group, "ACKED", "IDS", len(redis_ids), *redis_ids)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Failed to ack/delete %s: %s", redis_ids, exc)
@@ -0,0 +1,30 @@
+import time
+
+_iso_second = -1
+_iso_prefix = ""
+
+
+def monotonic_ms() -> int:
+    return time.monotonic_ns() // 1_000_000
+
+
+def wall_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
+def _iso_second_prefix(second: int) -> str:
+    # strftime only runs when the wall-clock second rolls over.
+    global _iso_second, _iso_prefix
+    if second != _iso_second:
+        _iso_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        _iso_second = second
+    return _iso_prefix
+
+
+def utc_iso_ms() -> str:
+    now_ns = time.time_ns()
+    return f"{_iso_second_prefix(now_ns // 1_000_000_000)}.{now_ns // 1_000_000 % 1000:03d}Z"
+
+
+def utc_iso_s() -> str:
+    return _iso_second_prefix(time.time_ns() // 1_000_000_000) + "Z"
@@ -4,7 +4,7 @@ import hashlib
 import os
 import re
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List
 
 from packages.llm_runtime.src import (
     LLMRequest,
@@ -221,6 +221,7 @@ class DeterministicReplyGenerator:
         observation_summary: str | None = None,
         prompt_id: str | None = None,
         prompt_purpose: str | None = None,
+        recent_messages: List[str] | None = None,
     ) -> str:
         persona_id = persona_cfg.get("persona_id", "persona")
         content = event_msg.get("content", "") or ""
@@ -292,7 +293,7 @@ class LLMReplyGenerator:
 
     def _recent_messages(self, state, room_id: str, budget_limit: int, budget_window_ms: int):
         room_state = state.get_room_state(room_id, budget_limit, budget_window_ms)
-        return [msg.get("content", "") or "" for msg in room_state.recent_messages]
+        return list(room_state.recent_contents)
 
     def generate_reply(
         self,
@@ -306,6 +307,7 @@ class LLMReplyGenerator:
         observation_summary: str | None = None,
         prompt_id: str | None = None,
         prompt_purpose: str | None = None,
+        recent_messages: List[str] | None = None,
     ) -> str:
         persona_id = persona_cfg.get("persona_id", "persona")
         display_name = persona_cfg.get("display_name", persona_id)
@@ -316,7 +318,10 @@ class LLMReplyGenerator:
         timing = room_cfg.get("timing", {})
         budget_limit = int(timing.get("max_bot_msgs_per_10s", settings.room_bot_budget_per_10s_default))
         budget_window_ms = 10_000
-        recent = self._recent_messages(state, room_id, budget_limit, budget_window_ms)
+        # Offloaded calls get a snapshot taken on the event loop instead of the live state.
+        if recent_messages is None:
+            recent_messages = self._recent_messages(state, room_id, budget_limit, budget_window_ms)
+        recent = recent_messages
         persona_profile = _build_persona_profile(persona_cfg)
         obs_summary = observation_summary or _extract_observation_summary(observation_context or "")
 
@@ -338,6 +343,7 @@ class LLMReplyGenerator:
             system_prompt, user_prompt = self.renderer.render_persona_auto_commentary(llm_req, prompt_id=prompt_id)
         else:
             system_prompt, user_prompt = self.renderer.render_persona_reply(llm_req, prompt_id=prompt_id)
+            llm_req.memory_messages = self.renderer.render_memory_messages(llm_req)
         llm_req.system_prompt = system_prompt
         llm_req.user_prompt = user_prompt
 
@@ -375,6 +381,7 @@ def generate_reply(
     observation_summary: str | None = None,
     prompt_id: str | None = None,
     prompt_purpose: str | None = None,
+    recent_messages: List[str] | None = None,
 ) -> str:
     return _default_generator.generate_reply(
         persona_cfg,
@@ -387,6 +394,7 @@ def generate_reply(
         observation_summary,
         prompt_id,
         prompt_purpose,
+        recent_messages,
     )
 
 
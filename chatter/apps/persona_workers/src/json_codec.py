@@ -0,0 +1,22 @@
+import json
+from typing import Any
+
+try:  # Optional speedup; containers install orjson
+    import orjson
+except ImportError:  # pragma: no cover - falls back to stdlib json
+    orjson = None
+
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(raw: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def dumps(obj: Any) -> str | bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    # Match orjson's compact UTF-8 output so the wire payload does not depend on which encoder ran.
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
-import json
+import heapq
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
+from string import Formatter
 from typing import Iterable, Sequence
 
 from jsonschema import Draft202012Validator
 
+from . import json_codec
+from .clock import wall_ms
 from .config_loader import ConfigValidationError
 from .state import ObservationEntry
 from .text_utils import sanitize_text
@@ -56,6 +61,26 @@ def _format_validation_error(errors: Iterable[Exception]) -> str:
     return "unknown validation error"
 
 
+# Tags and entities come from a small repeating vocabulary; memoize their sanitized form.
+_sanitize_label = lru_cache(maxsize=4096)(sanitize_text)
+
+_LINE_FIELDS = frozenset({"prefix", "ts", "summary", "tags", "entities", "hype"})
+
+
+@lru_cache(maxsize=16)
+def _compile_line_template(template: str) -> tuple[tuple[str, str | None], ...] | None:
+    # Plain {field} placeholders render by concatenation; specs/conversions fall back to str.format.
+    parts: list[tuple[str, str | None]] = []
+    try:
+        for literal, name, spec, conversion in Formatter().parse(template):
+            if name is not None and (spec or conversion or name not in _LINE_FIELDS):
+                return None
+            parts.append((literal, name))
+    except ValueError:
+        return None
+    return tuple(parts)
+
+
 def _validate_line_template(template: str) -> None:
     sample_values = {
         "prefix": "OBS:",
@@ -80,13 +105,11 @@ def load_observation_context_config(
     if not config_path.exists():
         raise ConfigValidationError(f"Observation context config not found at {config_path}")
 
-    with config_path.open("r", encoding="utf-8") as f:
-        raw = json.load(f)
+    raw = json_codec.loads(config_path.read_bytes())
     if not isinstance(raw, dict):
         raise ConfigValidationError("Observation context config must be a JSON object")
 
-    with schema_path.open("r", encoding="utf-8") as f:
-        schema = json.load(f)
+    schema = json_codec.loads(schema_path.read_bytes())
 
     Draft202012Validator.check_schema(schema)
     validator = Draft202012Validator(schema)
@@ -154,26 +177,30 @@ def derive_observation_ts_ms(observation: dict, redis_id: str, fallback_ms: int
         return redis_ms
     if fallback_ms is not None:
         return fallback_ms
-    return int(datetime.now(timezone.utc).timestamp() * 1000)
-
-
-def _entry_ts_ms(entry: ObservationEntry) -> int:
-    observation = entry.observation if isinstance(entry.observation, dict) else {}
-    return derive_observation_ts_ms(observation, entry.redis_id, entry.ts_ms)
+    return wall_ms()
 
 
-def _entry_ts_label(entry: ObservationEntry) -> str:
-    obs_ts = entry.observation.get("ts") if isinstance(entry.observation, dict) else None
+def derive_observation_ts_label(observation: dict, redis_id: str, ts_ms: int) -> str:
+    obs_ts = observation.get("ts") if isinstance(observation, dict) else None
     if isinstance(obs_ts, str) and obs_ts.strip():
         return obs_ts.strip()
-    redis_ms = _redis_id_ms(entry.redis_id)
+    redis_ms = _redis_id_ms(redis_id)
     if redis_ms is not None:
         return datetime.fromtimestamp(redis_ms / 1000.0, tz=timezone.utc).isoformat().replace("+00:00", "Z")
-    ts_ms = entry.ts_ms
     return datetime.fromtimestamp(ts_ms / 1000.0, tz=timezone.utc).isoformat().replace("+00:00", "Z")
 
 
+def _entry_ts_label(entry: ObservationEntry) -> str:
+    # Entries built at ingest carry a prerendered label; fall back for hand-built ones.
+    if entry.ts_label:
+        return entry.ts_label
+    return derive_observation_ts_label(entry.observation, entry.redis_id, entry.ts_ms)
+
+
 def _format_line(entry: ObservationEntry, config: ObservationContextConfig) -> str:
+    cached = entry.line_cache
+    if cached is not None and cached[0] is config:
+        return cached[1]
     observation = entry.observation if isinstance(entry.observation, dict) else {}
     summary_raw = observation.get("summary", "") or ""
     summary = sanitize_text(str(summary_raw)) if summary_raw else ""
@@ -190,14 +217,14 @@ def _format_line(entry: ObservationEntry, config: ObservationContextConfig) -> s
     tags_segment = ""
     if config.include_tags:
         tags = observation.get("tags") if isinstance(observation.get("tags"), list) else []
-        tags_clean = [sanitize_text(str(tag)) for tag in tags if str(tag).strip()]
+        tags_clean = [_sanitize_label(str(tag)) for tag in tags if str(tag).strip()]
         if tags_clean:
             tags_segment = f" | tags={','.join(tags_clean)}"
 
     entities_segment = ""
     if config.include_entities:
         entities = observation.get("entities") if isinstance(observation.get("entities"), list) else []
-        entities_clean = [sanitize_text(str(ent)) for ent in entities if str(ent).strip()]
+        entities_clean = [_sanitize_label(str(ent)) for ent in entities if str(ent).strip()]
         if entities_clean:
             entities_segment = f" | entities={','.join(entities_clean)}"
 
@@ -207,14 +234,21 @@ def _format_line(entry: ObservationEntry, config: ObservationContextConfig) -> s
         if isinstance(hype_value, (int, float)):
             hype_segment = f" | hype={float(hype_value):.2f}"
 
-    return config.line_template.format(
-        prefix=prefix_segment,
-        ts=ts_segment,
-        summary=summary,
-        tags=tags_segment,
-        entities=entities_segment,
-        hype=hype_segment,
-    ).strip()
+    values = {
+        "prefix": prefix_segment,
+        "ts": ts_segment,
+        "summary": summary,
+        "tags": tags_segment,
+        "entities": entities_segment,
+        "hype": hype_segment,
+    }
+    parts = _compile_line_template(config.line_template)
+    if parts is None:
+        line = config.line_template.format(**values).strip()
+    else:
+        line = "".join([literal + values[name] if name is not None else literal for literal, name in parts]).strip()
+    entry.line_cache = (config, line)
+    return line
 
 
 def _truncate_text(text: str, max_chars: int, suffix: str) -> str:
@@ -229,6 +263,9 @@ def _truncate_text(text: str, max_chars: int, suffix: str) -> str:
     return text[: max_chars - len(suffix)] + suffix
 
 
+_row_sort_key = itemgetter(0, 1)
+
+
 def format_observation_context(
     entries: Sequence[ObservationEntry],
     room_id: str,
@@ -238,36 +275,26 @@ def format_observation_context(
     if not entries or config.max_items <= 0 or config.max_chars <= 0:
         return ObservationContextResult("", [], 0)
 
-    filtered: list[tuple[int, ObservationEntry]] = []
+    # Rows carry their own (-ts_ms, obs_id) sort key so each id is built once per call.
+    filtered: list[tuple[int, str, ObservationEntry]] = []
+    max_age_ms = config.max_age_ms
     for entry in entries:
         observation = entry.observation if isinstance(entry.observation, dict) else {}
         if observation.get("room_id") != room_id:
             continue
-        ts_ms = _entry_ts_ms(entry)
-        if config.max_age_ms >= 0 and reference_ts_ms - ts_ms > config.max_age_ms:
+        # ts_ms is derived from the observation once at ingest (derive_observation_ts_ms).
+        ts_ms = entry.ts_ms
+        if max_age_ms >= 0 and reference_ts_ms - ts_ms > max_age_ms:
             continue
-        filtered.append((ts_ms, entry))
+        filtered.append((-ts_ms, str(observation.get("id") or entry.redis_id), entry))
 
     if not filtered:
         return ObservationContextResult("", [], 0)
 
-    def sort_key(item: tuple[int, ObservationEntry]) -> tuple[int, str]:
-        ts_ms, entry = item
-        obs_id = ""
-        observation = entry.observation if isinstance(entry.observation, dict) else {}
-        obs_id = str(observation.get("id") or entry.redis_id)
-        return (-ts_ms, obs_id)
-
-    filtered.sort(key=sort_key)
-    limited = filtered[: config.max_items] if config.max_items > 0 else filtered
-
-    lines: list[str] = []
-    ids: list[str] = []
-    for _, entry in limited:
-        observation = entry.observation if isinstance(entry.observation, dict) else {}
-        obs_id = str(observation.get("id") or entry.redis_id)
-        ids.append(obs_id)
-        lines.append(_format_line(entry, config))
+    # max_items > 0 here; nsmallest keeps sorted()[:n] semantics without sorting the whole buffer.
+    limited = heapq.nsmallest(config.max_items, filtered, key=_row_sort_key)
+    ids = [obs_id for _, obs_id, _ in limited]
+    lines = [_format_line(entry, config) for _, _, entry in limited]
 
     if not lines:
         return ObservationContextResult("", [], 0)
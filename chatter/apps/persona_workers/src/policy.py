@@ -1,32 +1,91 @@
+import calendar
 import hashlib
-import time
-from datetime import datetime, timezone
+import re
+import struct
+from datetime import datetime
+from functools import lru_cache
 from typing import Dict, Tuple
 
+from .clock import monotonic_ms, wall_ms
 from .settings import settings
 from .state import State
 from .text_utils import detect_hype_tokens, detect_mentions
 
 
-def _parse_ts(ts: str) -> datetime:
-    try:
-        if ts.endswith("Z"):
-            ts = ts[:-1] + "+00:00"
-        return datetime.fromisoformat(ts)
-    except Exception:  # noqa: BLE001
-        return datetime.now(timezone.utc)
+# blake2b (not hash()/xxhash) keeps p-gate scores stable across processes and releases.
+_blake2b = hashlib.blake2b
+_unpack_u64 = struct.Struct(">Q").unpack
+_HASH_SCALE = 1.0 / 2**64
+
+# E2E_TEST_BOTLOOP_ is covered by the E2E_TEST_ prefix.
+_MARKER_SEARCH = re.compile(r"E2E_TEST_|E2E_MARKER_").search
+
+
+# UTC ISO-8601 as emitted by our producers; anything else takes the fromisoformat path.
+_UTC_ISO_MATCH = re.compile(
+    r"([0-9]{4})-([0-9]{2})-([0-9]{2})T([0-9]{2}):([0-9]{2}):([0-9]{2})(?:\.([0-9]{1,6}))?(?:Z|\+00:00)"
+).fullmatch
+
+
+@lru_cache(maxsize=8192)
+def _parse_iso_ms(ts: str) -> int:
+    # Failures raise and are therefore never cached; only successful parses are memoized.
+    match = _UTC_ISO_MATCH(ts)
+    if match is not None:
+        year, month, day, hour, minute, second = (int(part) for part in match.group(1, 2, 3, 4, 5, 6))
+        if (
+            1 <= month <= 12
+            and 1 <= day <= calendar.monthrange(year, month)[1]
+            and hour < 24
+            and minute < 60
+            and second < 60
+        ):
+            fraction = match.group(7) or ""
+            return calendar.timegm((year, month, day, hour, minute, second, 0, 0, 0)) * 1000 + int(
+                fraction[:3].ljust(3, "0")
+            )
+    if ts[-1:] == "Z":
+        ts = ts[:-1] + "+00:00"
+    return int(datetime.fromisoformat(ts).timestamp() * 1000)
+
+
+def _ts_ms(ts: str | None) -> int:
+    if ts:
+        try:
+            return _parse_iso_ms(ts)
+        except Exception:  # noqa: BLE001
+            pass
+    return wall_ms()
 
 
 def _ts_ms_from_event(event_msg: dict) -> int:
-    ts_str = event_msg.get("ts")
-    if ts_str:
-        dt = _parse_ts(ts_str)
-    else:
-        dt = datetime.now(timezone.utc)
-    return int(dt.timestamp() * 1000)
+    return _ts_ms(event_msg.get("ts"))
 
 
 class PolicyEngine:
+    __slots__ = (
+        "room_cfg",
+        "persona_cfgs",
+        "state",
+        "p_base",
+        "p_mention_bonus",
+        "p_hype_bonus",
+        "p_rate_penalty_per_msg",
+        "soft_cooldown_ms",
+        "hard_cooldown_ms",
+        "cooldown_ms",
+        "max_bot_msgs_per_10s",
+        "bot_budget_window_ms",
+        "max_react_age_s",
+        "max_react_age_ms",
+        "room_id",
+        "bot_react_to_bot_weight",
+        "_scanned_content",
+        "_scan",
+        "_display_names",
+        "_base_thresholds",
+    )
+
     def __init__(self, room_cfg: dict, persona_cfgs: Dict[str, dict], state: State) -> None:
         self.room_cfg = room_cfg
         self.persona_cfgs = persona_cfgs
@@ -38,86 +97,116 @@ class PolicyEngine:
         self.p_rate_penalty_per_msg = float(timing_cfg.get("p_rate_penalty_per_msg", 0.01))
         self.soft_cooldown_ms = int(timing_cfg.get("soft_cooldown_ms", settings.persona_cooldown_ms_default))
         self.hard_cooldown_ms = timing_cfg.get("hard_cooldown_ms")
+        self.cooldown_ms = self.soft_cooldown_ms
+        if self.hard_cooldown_ms is not None:
+            self.cooldown_ms = max(self.cooldown_ms, int(self.hard_cooldown_ms))
         self.max_bot_msgs_per_10s = int(
             timing_cfg.get("max_bot_msgs_per_10s", settings.room_bot_budget_per_10s_default)
         )
         self.bot_budget_window_ms = 10_000
         self.max_react_age_s = settings.max_react_age_s
+        self.max_react_age_ms = self.max_react_age_s * 1000
         self.room_id = room_cfg.get("room_id") if room_cfg else None
         self.bot_react_to_bot_weight = timing_cfg.get("bot_react_to_bot_weight")
+        self._scanned_content: str | None = None
+        self._scan: Tuple[str, bool] = ("", False)
+        # Persona configs are fixed for the engine's lifetime; resolve display names once.
+        self._display_names = {persona_id: self._resolve_display_name(persona_id) for persona_id in persona_cfgs}
+        # Timing config is fixed too; fold the mention/hype bonuses for each signal pair up front.
+        self._base_thresholds = {
+            (mentioned, hype): self._fold_bonuses(mentioned, hype)
+            for mentioned in (False, True)
+            for hype in (False, True)
+        }
 
-    def should_speak(self, persona_id: str, event_msg: dict) -> Tuple[bool, str, dict]:
-        now = datetime.now(timezone.utc)
-        msg_ts = _parse_ts(event_msg.get("ts")) if event_msg.get("ts") else now
-        age_s = (now - msg_ts).total_seconds()
+    def message_gate(self, event_msg: dict) -> Tuple[str | None, dict]:
+        # Persona-independent checks; evaluate once per message and hand the result to should_speak.
+        now_ms = wall_ms()
+        msg_ts_ms = _ts_ms(event_msg.get("ts"))
         tags = {
             "p_used": None,
             "h_value": None,
             "mention_detected": False,
             "hype_detected": False,
             "rate_10s": 0,
-            "ts_ms": int(msg_ts.timestamp() * 1000),
+            "ts_ms": msg_ts_ms,
         }
 
         if event_msg.get("origin") == "bot":
-            return False, "bot_origin", tags
+            return "bot_origin", tags
 
-        if age_s > self.max_react_age_s:
-            return False, "too_old", tags
+        if now_ms - msg_ts_ms > self.max_react_age_ms:
+            return "too_old", tags
 
         if self.room_id and event_msg.get("room_id") not in {self.room_id, None}:
-            return False, "wrong_room", tags
+            return "wrong_room", tags
+
+        return None, tags
+
+    def should_speak(
+        self,
+        persona_id: str,
+        event_msg: dict,
+        now_ms: int | None = None,
+        gate: Tuple[str | None, dict] | None = None,
+    ) -> Tuple[bool, str, dict]:
+        # Reject paths hand back the shared per-message tags untouched; they are copied below
+        # only once this persona is going to annotate them.
+        reason, tags = gate if gate is not None else self.message_gate(event_msg)
+        if reason is not None:
+            return False, reason, tags
 
         content = event_msg.get("content", "") or ""
-        now_ms = int(time.time() * 1000)
+        if now_ms is None:
+            now_ms = monotonic_ms()
 
         persona_stats = self.state.get_persona_stats(persona_id)
         if persona_stats.last_spoke_at_ms is not None:
-            delta_ms = now_ms - persona_stats.last_spoke_at_ms
-            cooldown_ms = self.soft_cooldown_ms
-            if self.hard_cooldown_ms is not None:
-                cooldown_ms = max(cooldown_ms, int(self.hard_cooldown_ms))
-            if delta_ms < cooldown_ms:
+            if now_ms - persona_stats.last_spoke_at_ms < self.cooldown_ms:
                 return False, "cooldown", tags
 
+        # One room lookup serves both the budget check and the 10s rate below.
         room_state = self.state.get_room_state(
             event_msg.get("room_id", self.room_id or "room:demo"), self.max_bot_msgs_per_10s, self.bot_budget_window_ms
         )
         if not room_state.within_budget(now_ms):
             return False, "budget", tags
 
-        is_marker = any(token in content for token in ("E2E_TEST_", "E2E_TEST_BOTLOOP_", "E2E_MARKER_"))
-        if is_marker:
-            rate = self.state.get_room_rate_10s(
-                event_msg.get("room_id", self.room_id or "room:demo"), now_ms, self.max_bot_msgs_per_10s, self.bot_budget_window_ms
-            )
-            tags.update({
+        # Passing paths build their tags in one literal (same key order as the gate's base tags)
+        # instead of copying the shared dict and patching it key by key.
+        msg_ts_ms = tags["ts_ms"]
+        wall_now_ms = wall_ms()
+        if _MARKER_SEARCH(content) is not None:
+            return True, "e2e_forced", {
                 "p_used": 1.0,
                 "h_value": 0.0,
+                "mention_detected": False,
+                "hype_detected": False,
+                "rate_10s": room_state.rate_10s(wall_now_ms),
+                "ts_ms": msg_ts_ms,
                 "reason": "e2e_forced",
-                "rate_10s": rate,
                 "forced": True,
                 "marker_present": True,
-            })
-            return True, "e2e_forced", tags
+            }
 
         display_name = self._persona_display_name(persona_id)
-        mention_detected = detect_mentions(content, display_name)
+        lowered, hype_detected = self._scan_content(content)
+        mention_detected = detect_mentions(content, display_name, lowered)
         if mention_detected:
             persona_stats.record_mention(now_ms)
 
-        hype_detected = detect_hype_tokens(content)
-        tags["mention_detected"] = mention_detected
-        tags["hype_detected"] = hype_detected
-        tags["rate_10s"] = self.state.get_room_rate_10s(
-            event_msg.get("room_id", self.room_id or "room:demo"), now_ms, self.max_bot_msgs_per_10s, self.bot_budget_window_ms
-        )
-
+        rate_10s = room_state.rate_10s(wall_now_ms)
         message_id = event_msg.get("id")
         h_value = self._deterministic_hash_score(f"{message_id}:{persona_id}") if message_id else 1.0
-        p_threshold = self._compute_threshold(mention_detected, hype_detected, tags["rate_10s"])
-        tags["p_used"] = p_threshold
-        tags["h_value"] = h_value
+        p_threshold = self._compute_threshold(mention_detected, hype_detected, rate_10s)
+        tags = {
+            "p_used": p_threshold,
+            "h_value": h_value,
+            "mention_detected": mention_detected,
+            "hype_detected": hype_detected,
+            "rate_10s": rate_10s,
+            "ts_ms": msg_ts_ms,
+        }
         if self.bot_react_to_bot_weight is not None:
             tags["bot_react_to_bot_weight"] = self.bot_react_to_bot_weight
 
@@ -126,25 +215,42 @@ class PolicyEngine:
 
         return False, "p_gate", tags
 
+    def _scan_content(self, content: str) -> Tuple[str, bool]:
+        # Personas evaluate the same content object back to back; lower-case it and look for
+        # hype tokens once per message instead of once per persona.
+        if content is not self._scanned_content:
+            self._scan = (content.lower(), detect_hype_tokens(content))
+            self._scanned_content = content
+        return self._scan
+
     def _persona_display_name(self, persona_id: str) -> str:
+        display_name = self._display_names.get(persona_id)
+        if display_name is None:
+            return self._resolve_display_name(persona_id)
+        return display_name
+
+    def _resolve_display_name(self, persona_id: str) -> str:
         persona_cfg = self.persona_cfgs.get(persona_id, {})
         presentation = persona_cfg.get("presentation", {})
         return presentation.get("display_name") or persona_cfg.get("persona_id", persona_id)
 
-    def _compute_threshold(self, mentioned: bool, hype: bool, rate_10s: int) -> float:
+    def _fold_bonuses(self, mentioned: bool, hype: bool) -> float:
         p = self.p_base
         if mentioned:
             p = min(1.0, p + self.p_mention_bonus)
         if hype:
             p = min(1.0, p + self.p_hype_bonus)
+        return p
+
+    def _compute_threshold(self, mentioned: bool, hype: bool, rate_10s: int) -> float:
+        p = self._base_thresholds[mentioned, hype]
         if rate_10s > 0:
             p = max(0.02, p - self.p_rate_penalty_per_msg * rate_10s)
         return p
 
     def _deterministic_hash_score(self, value: str) -> float:
-        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest()
-        score = int.from_bytes(digest, "big") / float(2**64)
-        return score
+        # Multiplying by the exact power-of-two reciprocal is bit-identical to dividing by 2**64.
+        return _unpack_u64(_blake2b(value.encode("utf-8"), digest_size=8).digest())[0] * _HASH_SCALE
 
 
 def ts_ms_from_event(event_msg: dict) -> int:
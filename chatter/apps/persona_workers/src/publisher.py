@@ -1,38 +1,46 @@
-import json
 import logging
-from datetime import datetime, timezone
-from typing import Dict
-from uuid import uuid4
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import redis.asyncio as redis
 
+from . import json_codec
+from .clock import utc_iso_s
 from .validator import ChatMessageValidator
 
 logger = logging.getLogger(__name__)
 
 
 def _now_iso() -> str:
-    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return utc_iso_s()
 
 
-def build_chat_message(
-    persona: Dict, room_id: str, content: str, consumer_name: str, producer: str = "persona_worker"
-) -> Dict:
-    return {
+# (id(persona), producer, consumer_name) -> (persona, skeleton). The persona reference guards
+# against id() reuse; personas are loaded once per worker so this stays tiny.
+_SKELETONS: Dict[Tuple[int, str, str], Tuple[Dict, Dict]] = {}
+
+
+def _message_skeleton(persona: Dict, consumer_name: str, producer: str) -> Dict:
+    key = (id(persona), producer, consumer_name)
+    cached = _SKELETONS.get(key)
+    if cached is not None and cached[0] is persona:
+        return cached[1]
+    presentation = persona.get("presentation", {})
+    skeleton = {
         "schema_name": "ChatMessage",
         "schema_version": "1.0.0",
-        "id": _generate_id(),
-        "ts": _now_iso(),
-        "room_id": room_id,
+        "id": None,
+        "ts": None,
+        "room_id": None,
         "origin": "bot",
         "user_id": persona.get("persona_id"),
         "display_name": persona.get("display_name"),
-        "content": content,
+        "content": None,
         "reply_to": None,
         "mentions": [],
         "emotes": [],
-        "badges": persona.get("presentation", {}).get("badges", []),
-        "style": persona.get("presentation", {}).get("style"),
+        "badges": presentation.get("badges", []),
+        "style": presentation.get("style"),
         "client_meta": None,
         "moderation": None,
         "trace": {
@@ -41,10 +49,26 @@ def build_chat_message(
             "worker_instance": consumer_name,
         },
     }
+    _SKELETONS[key] = (persona, skeleton)
+    return skeleton
+
+
+def build_chat_message(
+    persona: Dict, room_id: str, content: str, consumer_name: str, producer: str = "persona_worker"
+) -> Dict:
+    # Shallow copy: nested values are shared with the skeleton and must not be mutated; messages
+    # are serialized straight away by the publish helpers below.
+    message = _message_skeleton(persona, consumer_name, producer).copy()
+    message["id"] = _generate_id()
+    message["ts"] = _now_iso()
+    message["room_id"] = room_id
+    message["content"] = content
+    return message
 
 
 def _generate_id() -> str:
-    return uuid4().hex
+    # Same 32-char lowercase hex shape as uuid4().hex, without building a UUID object.
+    return os.urandom(16).hex()
 
 
 async def publish_chat_message(
@@ -54,18 +78,56 @@ async def publish_chat_message(
     room_id: str,
     content: str,
     consumer_name: str,
-    validator: ChatMessageValidator,
+    validator: Optional[ChatMessageValidator],
     trace_producer: str = "persona_worker",
 ) -> bool:
     message = build_chat_message(persona, room_id, content, consumer_name, producer=trace_producer)
+    if validator is not None:
+        try:
+            validator.validate(message)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Generated message failed validation: %s", exc)
+            return False
     try:
-        validator.validate(message)
-    except Exception as exc:  # noqa: BLE001
-        logger.warning("Generated message failed validation: %s", exc)
-        return False
-    try:
-        await client.xadd(ingest_stream, {"data": json.dumps(message)})
+        await client.xadd(ingest_stream, {"data": json_codec.dumps(message)})
         return True
     except Exception as exc:  # noqa: BLE001
         logger.warning("Failed to publish message: %s", exc)
         return False
+
+
+async def publish_chat_messages(
+    client: redis.Redis,
+    ingest_stream: str,
+    replies: Sequence[Tuple[Dict, str, str]],
+    consumer_name: str,
+    validator: Optional[ChatMessageValidator],
+    trace_producer: str = "persona_worker",
+) -> List[bool]:
+    results = [False] * len(replies)
+    queued: List[Tuple[int, str | bytes]] = []
+    for index, (persona, room_id, content) in enumerate(replies):
+        message = build_chat_message(persona, room_id, content, consumer_name, producer=trace_producer)
+        if validator is not None:
+            try:
+                validator.validate(message)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Generated message failed validation: %s", exc)
+                continue
+        queued.append((index, json_codec.dumps(message)))
+    if not queued:
+        return results
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            for _, data in queued:
+                pipe.xadd(ingest_stream, {"data": data})
+            responses = await pipe.execute(raise_on_error=False)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Failed to publish messages: %s", exc)
+        return results
+    for (index, _), response in zip(queued, responses):
+        if isinstance(response, Exception):
+            logger.warning("Failed to publish message: %s", response)
+            continue
+        results[index] = True
+    return results
@@ -23,6 +23,13 @@ def _env(name: str, default: Optional[str] = None) -> Optional[str]:
     return os.environ.get(name, default)
 
 
+def _env_optional_int(name: str) -> Optional[int]:
+    raw = os.environ.get(name)
+    if raw is None or not raw.strip():
+        return None
+    return int(raw)
+
+
 def _env_optional_bool(name: str) -> Optional[bool]:
     raw = os.environ.get(name)
     if raw is None or not raw.strip():
@@ -30,17 +37,28 @@ def _env_optional_bool(name: str) -> Optional[bool]:
     return raw.strip().lower() in {"1", "true", "yes", "on"}
 
 
+def _consumer_name() -> str:
+    # Worker processes each need their own consumer in the group, or they would share one PEL.
+    # A single process keeps the bare name so it finds its pending entries again after a restart.
+    name = _env("CONSUMER_NAME", socket.gethostname())
+    if int(_env("UVICORN_WORKERS", "1")) > 1:
+        name = f"{name}-{os.getpid()}"
+    return name
+
+
 _load_dotenv_if_present()
 
 
-@dataclass
+# Settings are read on every hot path and never rebound after load; slots skip the instance dict.
+@dataclass(slots=True, frozen=True)
 class Settings:
     redis_url: str = _env("REDIS_URL", "redis://localhost:6379/0")
+    redis_max_connections: Optional[int] = _env_optional_int("REDIS_MAX_CONNECTIONS")
     firehose_stream: str = _env("FIREHOSE_STREAM", "stream:chat.firehose")
     ingest_stream: str = _env("INGEST_STREAM", "stream:chat.ingest")
     stream_observations_key: str = _env("STREAM_OBSERVATIONS_KEY", "stream:observations")
     consumer_group: str = _env("CONSUMER_GROUP", "persona_workers")
-    consumer_name: str = _env("CONSUMER_NAME", socket.gethostname())
+    consumer_name: str = _consumer_name()
     room_config_path: str = _env("ROOM_CONFIG_PATH", "configs/rooms/demo.json")
     persona_config_dir: str = _env("PERSONA_CONFIG_DIR", "configs/personas")
     moderation_config_path: str = _env("MODERATION_CONFIG_PATH", "configs/moderation/default.json")
@@ -60,7 +78,12 @@ class Settings:
         "SCHEMA_OBSERVATION_CONTEXT_PATH", "configs/schemas/observation_context.schema.json"
     )
     http_port: int = int(_env("HTTP_PORT", "8090"))
+    uvicorn_workers: int = int(_env("UVICORN_WORKERS", "1"))
     log_level: str = _env("LOG_LEVEL", "INFO")
+    stream_ack_delete: bool = _env("STREAM_ACK_DELETE", "false").lower() == "true"
+    validate_outgoing: bool = _env("VALIDATE_OUTGOING", "true").lower() == "true"
+    firehose_read_count: int = int(_env("FIREHOSE_READ_COUNT", "500"))
+    firehose_read_block_ms: int = int(_env("FIREHOSE_READ_BLOCK_MS", "5000"))
 
     memory_enabled: bool = _env("MEMORY_ENABLED", "false").lower() == "true"
     memory_backend: str = _env("MEMORY_BACKEND", "stub")
@@ -1,20 +1,98 @@
+from bisect import bisect_left, insort
 from collections import OrderedDict, deque
 from dataclasses import dataclass, field
+from operator import attrgetter
 from typing import Deque, Dict, List, Optional
 
-
-@dataclass
+DECISION_REASONS = (
+    "deduped",
+    "bot_origin",
+    "too_old",
+    "wrong_room",
+    "cooldown",
+    "budget",
+    "e2e_forced",
+    "p_pass",
+    "p_gate",
+)
+REASON_IDX = {reason: idx for idx, reason in enumerate(DECISION_REASONS)}
+
+
+@dataclass(slots=True)
 class ObservationEntry:
     redis_id: str
     ts_ms: int
     observation: dict
+    ts_label: str = ""
+    # (config, rendered line) from the last format pass; observations are immutable once buffered.
+    line_cache: Optional[tuple] = field(default=None, compare=False, repr=False)
+
+
+_observation_order = attrgetter("ts_ms", "redis_id")
+_observation_ts_ms = attrgetter("ts_ms")
 
 
 @dataclass
+class BucketedRateWindow:
+    """Approximate sliding-window counter over bucket_count fixed buckets of bucket_ms each.
+
+    A write is dropped when its bucket falls bucket_count buckets behind, so it stays counted
+    for between (bucket_count - 1) * bucket_ms and bucket_count * bucket_ms depending on where
+    it lands in its bucket: 50-60s for a 60s window with six 10s buckets.
+    """
+
+    window_ms: int
+    bucket_count: int = 6
+    bucket_ms: int = field(init=False)
+    buckets: List[int] = field(init=False)
+    last_bucket: int = field(init=False, default=0)
+    total: int = field(init=False, default=0)
+
+    def __post_init__(self) -> None:
+        self.bucket_count = max(1, self.bucket_count)
+        self.bucket_ms = max(1, self.window_ms // self.bucket_count)
+        self.buckets = [0] * self.bucket_count
+
+    def count(self, now_ms: int) -> int:
+        self._advance(now_ms)
+        return self.total
+
+    def record(self, now_ms: int) -> None:
+        self._advance(now_ms)
+        self.buckets[self.last_bucket % self.bucket_count] += 1
+        self.total += 1
+
+    def _advance(self, now_ms: int) -> None:
+        bucket = now_ms // self.bucket_ms
+        steps = bucket - self.last_bucket
+        if steps <= 0:
+            return
+        if steps >= self.bucket_count:
+            for idx in range(self.bucket_count):
+                self.buckets[idx] = 0
+            self.total = 0
+        else:
+            for offset in range(1, steps + 1):
+                idx = (self.last_bucket + offset) % self.bucket_count
+                self.total -= self.buckets[idx]
+                self.buckets[idx] = 0
+        self.last_bucket = bucket
+
+
+def _prune_before(times: Deque[int], cutoff_ms: int) -> None:
+    # Timestamps are appended in order; drop the expired prefix with the cutoff computed once.
+    popleft = times.popleft
+    while times and times[0] < cutoff_ms:
+        popleft()
+
+
+@dataclass(slots=True)
 class RoomState:
     room_id: str
     max_recent: int
     recent_messages: Deque[dict] = field(init=False)
+    # Parallel ring of message contents; prompt builders only ever read this column.
+    recent_contents: Deque[str] = field(init=False)
     bot_budget_window_ms: int = 10_000
     bot_budget_limit: int = 5
     bot_publish_times: Deque[int] = field(init=False)
@@ -22,78 +100,102 @@ class RoomState:
 
     def __post_init__(self) -> None:
         self.recent_messages = deque(maxlen=self.max_recent)
+        self.recent_contents = deque(maxlen=self.max_recent)
         self.bot_publish_times = deque()
         self.event_times = deque()
 
     def add_message(self, message: dict) -> None:
+        get = message.get
         minimal = {
-            "id": message.get("id"),
-            "ts": message.get("ts"),
-            "origin": message.get("origin"),
-            "user_id": message.get("user_id"),
-            "display_name": message.get("display_name"),
-            "content": message.get("content"),
+            "id": get("id"),
+            "ts": get("ts"),
+            "origin": get("origin"),
+            "user_id": get("user_id"),
+            "display_name": get("display_name"),
+            "content": get("content"),
         }
         self.recent_messages.append(minimal)
+        self.recent_contents.append(minimal["content"] or "")
 
     def record_bot_publish(self, now_ms: int) -> None:
         self.bot_publish_times.append(now_ms)
         self._prune_budget(now_ms)
 
+    def release_bot_publish(self, now_ms: int) -> None:
+        try:
+            self.bot_publish_times.remove(now_ms)
+        except ValueError:
+            pass
+
     def record_event(self, ts_ms: int) -> None:
         self.event_times.append(ts_ms)
         self._prune_events(ts_ms)
 
     def within_budget(self, now_ms: int) -> bool:
-        self._prune_budget(now_ms)
-        return len(self.bot_publish_times) < self.bot_budget_limit
+        # Probe the head before calling into the prune loop; usually nothing has expired.
+        times = self.bot_publish_times
+        if times and now_ms - times[0] > self.bot_budget_window_ms:
+            self._prune_budget(now_ms)
+        return len(times) < self.bot_budget_limit
 
     def rate_10s(self, now_ms: int) -> int:
-        self._prune_events(now_ms)
-        return len(self.event_times)
+        times = self.event_times
+        if times and now_ms - times[0] > 10_000:
+            self._prune_events(now_ms)
+        return len(times)
 
     def _prune_budget(self, now_ms: int) -> None:
-        while self.bot_publish_times and now_ms - self.bot_publish_times[0] > self.bot_budget_window_ms:
-            self.bot_publish_times.popleft()
+        _prune_before(self.bot_publish_times, now_ms - self.bot_budget_window_ms)
 
     def _prune_events(self, now_ms: int) -> None:
-        window_ms = 10_000
-        while self.event_times and now_ms - self.event_times[0] > window_ms:
-            self.event_times.popleft()
+        _prune_before(self.event_times, now_ms - 10_000)
 
 
-@dataclass
+@dataclass(slots=True)
 class PersonaStats:
     persona_id: str
     last_spoke_at_ms: Optional[int] = None
     messages_published: int = 0
-    mention_events: Deque[int] = field(default_factory=lambda: deque())
+    mention_events: Deque[int] = field(default_factory=deque)
 
     def record_mention(self, ts_ms: int) -> None:
         self.mention_events.append(ts_ms)
         self._prune_mentions(ts_ms)
 
     def mentions_last_30s(self, now_ms: int) -> int:
-        self._prune_mentions(now_ms)
-        return len(self.mention_events)
+        events = self.mention_events
+        if events and now_ms - events[0] > 30_000:
+            self._prune_mentions(now_ms)
+        return len(events)
 
     def _prune_mentions(self, now_ms: int) -> None:
-        window_ms = 30_000
-        while self.mention_events and now_ms - self.mention_events[0] > window_ms:
-            self.mention_events.popleft()
+        _prune_before(self.mention_events, now_ms - 30_000)
+
+
+def _cooldown_ready(last_spoke: Dict[str, int], key: str, now_ms: int, window_ms: int) -> bool:
+    if window_ms <= 0:
+        return True
+    last_ms = last_spoke.get(key)
+    return last_ms is None or now_ms - last_ms >= window_ms
 
 
 class State:
     def __init__(self, max_recent: int, dedupe_size: int) -> None:
         self.max_recent = max_recent
         self.dedupe_size = dedupe_size
+        # Not a plain dict: OrderedDict.popitem(last=False) is O(1), while del d[next(iter(d))]
+        # rescans the deleted-entry prefix at the front of the dict until it resizes.
         self.dedupe_cache: "OrderedDict[str, None]" = OrderedDict()
         self.rooms: Dict[str, RoomState] = {}
         self.persona_stats: Dict[str, PersonaStats] = {}
         self.observations: Dict[str, List[ObservationEntry]] = {}
+        self._observations_total = 0
         self.auto_room_last_spoke: Dict[str, int] = {}
         self.auto_persona_last_spoke: Dict[str, int] = {}
-        self.auto_dedupe: "OrderedDict[str, int]" = OrderedDict()
+        # Soft cap on the time-windowed auto-commentary maps so a long window under a burst of
+        # observations cannot grow them without bound; the oldest entries go first.
+        self.auto_dedupe_max = 8192
+        self.auto_dedupe: "OrderedDict[tuple[str, str], int]" = OrderedDict()
         self.auto_observation_counts: "OrderedDict[str, tuple[int, int]]" = OrderedDict()
         self.auto_last_observation_ids: Deque[str] = deque(maxlen=5)
         self.auto_room_publish_times: Dict[str, Deque[int]] = {}
@@ -101,25 +203,30 @@ class State:
         self.auto_summary_dedupe: "OrderedDict[str, int]" = OrderedDict()
 
     def get_room_state(self, room_id: str, budget_limit: int, budget_window_ms: int) -> RoomState:
-        if room_id not in self.rooms:
+        state = self.rooms.get(room_id)
+        if state is None:
             state = RoomState(room_id=room_id, max_recent=self.max_recent)
             state.bot_budget_limit = budget_limit
             state.bot_budget_window_ms = budget_window_ms
             self.rooms[room_id] = state
-        return self.rooms[room_id]
+        return state
 
     def get_persona_stats(self, persona_id: str) -> PersonaStats:
-        if persona_id not in self.persona_stats:
-            self.persona_stats[persona_id] = PersonaStats(persona_id=persona_id)
-        return self.persona_stats[persona_id]
+        stats = self.persona_stats.get(persona_id)
+        if stats is None:
+            stats = self.persona_stats[persona_id] = PersonaStats(persona_id=persona_id)
+        return stats
 
     def seen_before(self, message_id: str) -> bool:
-        if message_id in self.dedupe_cache:
+        # One hashed store instead of a membership probe plus a store: an existing id leaves the
+        # size unchanged (and keeps its FIFO position).
+        cache = self.dedupe_cache
+        size = len(cache)
+        cache[message_id] = None
+        if len(cache) == size:
             return True
-        self.dedupe_cache[message_id] = None
-        self.dedupe_cache.move_to_end(message_id)
-        if len(self.dedupe_cache) > self.dedupe_size:
-            self.dedupe_cache.popitem(last=False)
+        if size >= self.dedupe_size:
+            cache.popitem(last=False)
         return False
 
     def record_auto_observation_id(self, obs_id: str) -> None:
@@ -128,11 +235,13 @@ class State:
 
     def auto_seen_before(self, dedupe_key: str, persona_id: str, now_ms: int, window_ms: int) -> bool:
         self._prune_auto_dedupe(now_ms, window_ms)
-        key = f"{dedupe_key}:{persona_id}"
+        key = (dedupe_key, persona_id)
         if key in self.auto_dedupe:
             return True
+        # New keys land at the tail already, so no move_to_end is needed.
         self.auto_dedupe[key] = now_ms
-        self.auto_dedupe.move_to_end(key)
+        if len(self.auto_dedupe) > self.auto_dedupe_max:
+            self.auto_dedupe.popitem(last=False)
         return False
 
     def auto_observation_count(self, obs_id: str, now_ms: int, window_ms: int) -> int:
@@ -148,24 +257,16 @@ class State:
             self.auto_observation_counts[obs_id] = (first_seen, count)
         else:
             self.auto_observation_counts[obs_id] = (now_ms, 1)
+            if len(self.auto_observation_counts) > self.auto_dedupe_max:
+                self.auto_observation_counts.popitem(last=False)
         self.auto_observation_counts.move_to_end(obs_id)
         return self.auto_observation_counts[obs_id][1]
 
     def auto_persona_ready(self, persona_id: str, now_ms: int, cooldown_ms: int) -> bool:
-        if cooldown_ms <= 0:
-            return True
-        last_ms = self.auto_persona_last_spoke.get(persona_id)
-        if last_ms is None:
-            return True
-        return now_ms - last_ms >= cooldown_ms
+        return _cooldown_ready(self.auto_persona_last_spoke, persona_id, now_ms, cooldown_ms)
 
     def auto_room_ready(self, room_id: str, now_ms: int, rate_limit_ms: int) -> bool:
-        if rate_limit_ms <= 0:
-            return True
-        last_ms = self.auto_room_last_spoke.get(room_id)
-        if last_ms is None:
-            return True
-        return now_ms - last_ms >= rate_limit_ms
+        return _cooldown_ready(self.auto_room_last_spoke, room_id, now_ms, rate_limit_ms)
 
     def auto_room_momentum_ready(
         self, room_id: str, now_ms: int, window_ms: int, max_msgs: int, min_interval_ms: int
@@ -209,21 +310,23 @@ class State:
         if window_ms <= 0:
             self.auto_dedupe.clear()
             return
-        while self.auto_dedupe:
-            _, ts_ms = next(iter(self.auto_dedupe.items()))
-            if now_ms - ts_ms <= window_ms:
+        entries = self.auto_dedupe
+        while entries:
+            oldest = next(iter(entries))
+            if now_ms - entries[oldest] <= window_ms:
                 break
-            self.auto_dedupe.popitem(last=False)
+            del entries[oldest]
 
     def _prune_auto_observation_counts(self, now_ms: int, window_ms: int) -> None:
         if window_ms <= 0:
             self.auto_observation_counts.clear()
             return
-        while self.auto_observation_counts:
-            _, (ts_ms, _) = next(iter(self.auto_observation_counts.items()))
-            if now_ms - ts_ms <= window_ms:
+        counts = self.auto_observation_counts
+        while counts:
+            oldest = next(iter(counts))
+            if now_ms - counts[oldest][0] <= window_ms:
                 break
-            self.auto_observation_counts.popitem(last=False)
+            del counts[oldest]
 
     def auto_summary_seen_before(self, summary_hash: str, now_ms: int, ttl_ms: int) -> bool:
         self._prune_auto_summary_dedupe(now_ms, ttl_ms)
@@ -234,16 +337,19 @@ class State:
             return
         self.auto_summary_dedupe[summary_hash] = now_ms
         self.auto_summary_dedupe.move_to_end(summary_hash)
+        if len(self.auto_summary_dedupe) > self.auto_dedupe_max:
+            self.auto_summary_dedupe.popitem(last=False)
 
     def _prune_auto_summary_dedupe(self, now_ms: int, ttl_ms: int) -> None:
         if ttl_ms <= 0:
             self.auto_summary_dedupe.clear()
             return
-        while self.auto_summary_dedupe:
-            _, ts_ms = next(iter(self.auto_summary_dedupe.items()))
-            if now_ms - ts_ms <= ttl_ms:
+        entries = self.auto_summary_dedupe
+        while entries:
+            oldest = next(iter(entries))
+            if now_ms - entries[oldest] <= ttl_ms:
                 break
-            self.auto_summary_dedupe.popitem(last=False)
+            del entries[oldest]
 
     def add_recent_message(self, room_id: str, message: dict, budget_limit: int, budget_window_ms: int) -> None:
         room_state = self.get_room_state(room_id, budget_limit, budget_window_ms)
@@ -253,6 +359,10 @@ class State:
         room_state = self.get_room_state(room_id, budget_limit, budget_window_ms)
         room_state.record_bot_publish(now_ms)
 
+    def release_publish(self, room_id: str, now_ms: int, budget_limit: int, budget_window_ms: int) -> None:
+        room_state = self.get_room_state(room_id, budget_limit, budget_window_ms)
+        room_state.release_bot_publish(now_ms)
+
     def record_event(self, room_id: str, ts_ms: int, origin: str, budget_limit: int, budget_window_ms: int) -> None:
         room_state = self.get_room_state(room_id, budget_limit, budget_window_ms)
         room_state.record_event(ts_ms)
@@ -265,20 +375,27 @@ class State:
         self, room_id: str, entry: ObservationEntry, now_ms: int, max_age_ms: int, max_items: int
     ) -> int:
         entries = self.observations.setdefault(room_id, [])
-        entries.append(entry)
+        # Buffers stay ordered by (ts_ms, redis_id); arrivals are nearly monotonic, so this is
+        # usually an append and pruning only trims the ends.
+        if entries and _observation_order(entry) < _observation_order(entries[-1]):
+            insort(entries, entry, key=_observation_order)
+        else:
+            entries.append(entry)
+        self._observations_total += 1
         return self.prune_observations(room_id, now_ms, max_age_ms, max_items)
 
     def prune_observations(self, room_id: str, now_ms: int, max_age_ms: int, max_items: int) -> int:
-        entries = self.observations.get(room_id, [])
+        entries = self.observations.get(room_id)
         if not entries:
             return 0
-        threshold = now_ms - max_age_ms
-        kept = [entry for entry in entries if entry.ts_ms >= threshold]
-        dropped_old = len(entries) - len(kept)
-        kept.sort(key=lambda entry: (entry.ts_ms, entry.redis_id))
-        if max_items > 0 and len(kept) > max_items:
-            kept = kept[-max_items:]
-        self.observations[room_id] = kept
+        dropped_old = bisect_left(entries, now_ms - max_age_ms, key=_observation_ts_ms)
+        if dropped_old:
+            del entries[:dropped_old]
+            self._observations_total -= dropped_old
+        if max_items > 0 and len(entries) > max_items:
+            over = len(entries) - max_items
+            del entries[:over]
+            self._observations_total -= over
         return dropped_old
 
     def get_recent_observations(
@@ -288,13 +405,13 @@ class State:
         return list(self.observations.get(room_id, []))
 
     def observations_total(self) -> int:
-        return sum(len(entries) for entries in self.observations.values())
+        return self._observations_total
 
 
 RuntimeState = State
 
 
-@dataclass
+@dataclass(slots=True)
 class Stats:
     messages_consumed: int = 0
     messages_deduped: int = 0
@@ -304,6 +421,7 @@ class Stats:
     messages_suppressed_bot_origin: int = 0
     last_decision_reasons: Dict[str, str] = field(default_factory=dict)
     decisions_by_reason: Dict[str, int] = field(default_factory=dict)
+    reason_counts: List[int] = field(default_factory=lambda: [0] * len(DECISION_REASONS))
     last_decisions: Deque[dict] = field(default_factory=lambda: deque(maxlen=20))
     memory_enabled: bool = False
     memory_backend: str | None = None
@@ -372,20 +490,22 @@ class Stats:
     auto_last_decision: dict | None = None
 
     def record_decision(self, persona_id: str, reason: str, tags: Optional[dict] = None) -> None:
-        tags = tags or {}
-        self.decisions_by_reason[reason] = self.decisions_by_reason.get(reason, 0) + 1
-        decision = {
-            "persona_id": persona_id,
-            "reason": reason,
-        }
+        idx = REASON_IDX.get(reason)
+        if idx is not None:
+            self.reason_counts[idx] += 1
+        else:
+            self.decisions_by_reason[reason] = self.decisions_by_reason.get(reason, 0) + 1
         if tags:
+            decision = {"ts_ms": tags.get("ts_ms"), "persona_id": persona_id, "reason": reason}
             decision.update(tags)
-        self.last_decisions.append(
-            {
-                "ts_ms": tags.get("ts_ms"),
-                **decision,
-            }
-        )
+        else:
+            decision = {"ts_ms": None, "persona_id": persona_id, "reason": reason}
+        self.last_decisions.append(decision)
+
+    def decision_counts(self) -> Dict[str, int]:
+        counts = {reason: count for reason, count in zip(DECISION_REASONS, self.reason_counts) if count}
+        counts.update(self.decisions_by_reason)
+        return counts
 
     def as_dict(self, enabled_personas: List[str], room_id: str) -> dict:
         return {
@@ -396,7 +516,7 @@ class Stats:
             "messages_suppressed_budget": self.messages_suppressed_budget,
             "messages_suppressed_bot_origin": self.messages_suppressed_bot_origin,
             "last_decision_reasons": self.last_decision_reasons,
-            "decisions_by_reason": self.decisions_by_reason,
+            "decisions_by_reason": self.decision_counts(),
             "recent_decisions": list(self.last_decisions),
             "enabled_personas": enabled_personas,
             "room_id": room_id,
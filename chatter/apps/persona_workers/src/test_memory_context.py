@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import os
+import unittest
+
+# main builds its service at import; point the config paths at the repo copies.
+os.environ.setdefault("OBS_CONTEXT_CONFIG_PATH", "configs/observation_context/default.json")
+os.environ.setdefault("AUTO_COMMENTARY_CONFIG_PATH", "configs/auto_commentary/default.json")
+
+from apps.persona_workers.src.main import PersonaWorkerService  # noqa: E402
+from packages.memory_runtime.src import MemoryItem, StubMemoryStore  # noqa: E402
+
+SCOPE_KEY = "persona_room:room:demo:Alice"
+
+
+class MemoryContextTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.service = PersonaWorkerService()
+        self.service.memory_enabled = True
+        self.service.memory_policy = {"scopes": ["persona_room"]}
+        self.service.memory_store = StubMemoryStore()
+        for idx, value in enumerate(("tacos forever", "tacos and nachos", "tacos again")):
+            item = MemoryItem.from_dict(
+                {
+                    "id": f"mem00000{idx + 1}",
+                    "ts": f"2024-01-0{idx + 1}T00:00:00Z",
+                    "scope": "persona_room",
+                    "scope_key": SCOPE_KEY,
+                    "category": "preference",
+                    "subject": "food",
+                    "value": value,
+                    "confidence": 0.9,
+                    "ttl_days": 30,
+                    "source": {"kind": "test"},
+                }
+            )
+            self.service.memory_store.upsert(SCOPE_KEY, item)
+
+    async def test_overflowing_item_is_reported_but_not_rendered(self) -> None:
+        # The first line takes 32 characters; adding the second would take 70.
+        self.service.memory_max_chars = 60
+        block, ids = await self.service._build_memory_context("Alice", "room:demo", "tacos")
+
+        self.assertEqual(ids, ["mem000003", "mem000002"])
+        self.assertIn("- [preference] food: tacos again", block)
+        self.assertNotIn("tacos and nachos", block)
+        self.assertEqual(list(self.service.stats.last_memory_read_ids), ids)
+
+    async def test_every_item_is_reported_when_the_block_fits(self) -> None:
+        self.service.memory_max_chars = 1_000
+        block, ids = await self.service._build_memory_context("Alice", "room:demo", "tacos")
+
+        self.assertEqual(ids, ["mem000003", "mem000002", "mem000001"])
+        self.assertEqual(block.count("\n- "), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
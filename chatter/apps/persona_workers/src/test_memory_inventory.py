@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import os
+import unittest
+
+# main builds its service at import; point the config paths at the repo copies.
+os.environ.setdefault("OBS_CONTEXT_CONFIG_PATH", "configs/observation_context/default.json")
+os.environ.setdefault("AUTO_COMMENTARY_CONFIG_PATH", "configs/auto_commentary/default.json")
+
+from apps.persona_workers.src.main import PersonaWorkerService  # noqa: E402
+from packages.memory_runtime.src import MemoryItem, StubMemoryStore  # noqa: E402
+
+ROOM_SCOPE = "persona_room:room:demo:Alice"
+PERSONA_SCOPE = "persona:Alice"
+
+
+def _item(memory_id: str, scope: str, scope_key: str) -> MemoryItem:
+    return MemoryItem.from_dict(
+        {
+            "id": memory_id,
+            "ts": "2024-01-01T00:00:00Z",
+            "scope": scope,
+            "scope_key": scope_key,
+            "category": "preference",
+            "subject": "food",
+            "value": "tacos",
+            "confidence": 0.9,
+            "ttl_days": 30,
+            "source": {"kind": "test"},
+        }
+    )
+
+
+class MemoryInventoryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.service = PersonaWorkerService()
+        self.service.memory_store = StubMemoryStore()
+        self.service._seed_memory_inventory()
+
+    def _upsert(self, item: MemoryItem) -> None:
+        self.service.memory_store.upsert(item.scope_key, item)
+        self.service._record_memory_upsert(item)
+
+    def test_reupsert_under_another_scope_moves_the_count(self) -> None:
+        self._upsert(_item("mem000001", "persona_room", ROOM_SCOPE))
+        self._upsert(_item("mem000001", "persona", PERSONA_SCOPE))
+
+        self.assertEqual(sum(len(items) for items in self.service.memory_store.dump().values()), 1)
+        self.assertEqual(self.service._memory_inventory(), (1, {PERSONA_SCOPE: 1}))
+
+    def test_reupsert_under_the_same_scope_counts_once(self) -> None:
+        self._upsert(_item("mem000001", "persona_room", ROOM_SCOPE))
+        self._upsert(_item("mem000002", "persona_room", ROOM_SCOPE))
+        self._upsert(_item("mem000001", "persona_room", ROOM_SCOPE))
+
+        self.assertEqual(self.service._memory_inventory(), (2, {ROOM_SCOPE: 2}))
+
+    def test_reseed_matches_incremental_counts(self) -> None:
+        self._upsert(_item("mem000001", "persona_room", ROOM_SCOPE))
+        self._upsert(_item("mem000001", "persona", PERSONA_SCOPE))
+        self._upsert(_item("mem000002", "persona_room", ROOM_SCOPE))
+        incremental = self.service._memory_inventory()
+
+        self.service._seed_memory_inventory()
+        self.assertEqual(self.service._memory_inventory(), incremental)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import json
+import os
+import unittest
+
+# main builds its service at import; point the config paths at the repo copies.
+os.environ.setdefault("OBS_CONTEXT_CONFIG_PATH", "configs/observation_context/default.json")
+os.environ.setdefault("AUTO_COMMENTARY_CONFIG_PATH", "configs/auto_commentary/default.json")
+
+from apps.persona_workers.src.main import PersonaWorkerService  # noqa: E402
+
+ROOM_ID = "room:demo"
+
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis") -> None:
+        self.redis = redis
+        self.queued: list[str] = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> bool:
+        return False
+
+    def xadd(self, stream: str, fields: dict) -> "FakePipeline":
+        self.queued.append(fields["data"])
+        return self
+
+    async def execute(self, raise_on_error: bool = True) -> list:
+        responses = []
+        for data in self.queued:
+            user_id = json.loads(data)["user_id"]
+            if user_id in self.redis.failing_users:
+                responses.append(RuntimeError("xadd failed"))
+                continue
+            self.redis.added.append(user_id)
+            responses.append(f"{len(self.redis.added)}-0")
+        return responses
+
+
+class FakeRedis:
+    def __init__(self, failing_users: set[str]) -> None:
+        self.failing_users = failing_users
+        self.added: list[str] = []
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+
+class PublishRepliesBudgetTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.service = PersonaWorkerService()
+        self.persona_ids = list(self.service.personas)[:3]
+        self.assertEqual(len(self.persona_ids), 3)
+        self.ok_id, self.gen_fail_id, self.xadd_fail_id = self.persona_ids
+        self.service.redis = FakeRedis({self.xadd_fail_id})
+
+        generate = self.service.reply_generator.generate_reply
+        self.service.offload_generation = False
+
+        def generate_reply(persona, *args, **kwargs):
+            if persona.get("persona_id") == self.gen_fail_id:
+                raise RuntimeError("generation failed")
+            return generate(persona, *args, **kwargs)
+
+        self.service.reply_generator.generate_reply = generate_reply
+
+    def _room_state(self):
+        return self.service.state.get_room_state(ROOM_ID, self.service.budget_limit, self.service.budget_window_ms)
+
+    async def test_failed_speakers_release_only_their_own_budget_slot(self) -> None:
+        speakers = []
+        # Distinct reservation times so the surviving slot identifies its owner.
+        for offset, persona_id in enumerate(self.persona_ids):
+            reserved_ms = 1_000 + offset
+            self.service.state.record_publish(
+                ROOM_ID, reserved_ms, self.service.budget_limit, self.service.budget_window_ms
+            )
+            tags = {"reason": "e2e_forced", "ts_ms": reserved_ms}
+            speakers.append((persona_id, self.service.personas[persona_id], tags, reserved_ms))
+        self.assertEqual(list(self._room_state().bot_publish_times), [1_000, 1_001, 1_002])
+
+        payload = {"id": "msg-1", "room_id": ROOM_ID, "content": "E2E_TEST_budget", "origin": "human"}
+        await self.service._publish_replies(ROOM_ID, speakers, None, payload, payload["content"], "1-0")
+
+        self.assertEqual(self.service.redis.added, [self.ok_id])
+        self.assertEqual(list(self._room_state().bot_publish_times), [1_000])
+        self.assertEqual(self.service.stats.messages_published, 1)
+
+        ok_stats = self.service.state.get_persona_stats(self.ok_id)
+        self.assertIsNotNone(ok_stats.last_spoke_at_ms)
+        self.assertEqual(ok_stats.messages_published, 1)
+        for persona_id in (self.gen_fail_id, self.xadd_fail_id):
+            stats = self.service.state.get_persona_stats(persona_id)
+            self.assertIsNone(stats.last_spoke_at_ms)
+            self.assertEqual(stats.messages_published, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
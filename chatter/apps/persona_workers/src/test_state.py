@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import unittest
+
+from apps.persona_workers.src.state import BucketedRateWindow
+
+
+class BucketedRateWindowTests(unittest.TestCase):
+    def setUp(self) -> None:
+        # 1s buckets; a write stays counted until its bucket falls six buckets behind.
+        self.window = BucketedRateWindow(window_ms=6_000, bucket_count=6)
+
+    def assertTotalMatchesBuckets(self) -> None:
+        self.assertEqual(self.window.total, sum(self.window.buckets))
+
+    def test_write_expires_at_its_bucket_boundary(self) -> None:
+        self.window.record(1_500)
+        self.assertEqual(self.window.count(6_999), 1)
+        self.assertEqual(self.window.count(7_000), 0)
+        self.assertTotalMatchesBuckets()
+
+    def test_write_stays_counted_between_five_and_six_buckets(self) -> None:
+        # Effective window is (bucket_count - 1) * bucket_ms to bucket_count * bucket_ms.
+        early = BucketedRateWindow(window_ms=6_000, bucket_count=6)
+        early.record(1_000)
+        self.assertEqual(early.count(1_000 + 5_999), 1)
+        self.assertEqual(early.count(1_000 + 6_000), 0)
+
+        late = BucketedRateWindow(window_ms=6_000, bucket_count=6)
+        late.record(1_999)
+        self.assertEqual(late.count(1_999 + 5_000), 1)
+        self.assertEqual(late.count(1_999 + 5_001), 0)
+
+    def test_writes_in_successive_buckets_expire_one_by_one(self) -> None:
+        for now_ms in (500, 1_500, 1_900, 2_500):
+            self.window.record(now_ms)
+        self.assertEqual(self.window.count(5_999), 4)
+        self.assertEqual(self.window.count(6_000), 3)
+        self.assertEqual(self.window.count(7_000), 1)
+        self.assertTotalMatchesBuckets()
+        self.window.record(7_100)
+        self.assertEqual(self.window.count(7_200), 2)
+        self.assertEqual(self.window.count(8_000), 1)
+        self.assertEqual(self.window.count(12_999), 1)
+        self.assertEqual(self.window.count(13_000), 0)
+        self.assertTotalMatchesBuckets()
+
+    def test_gap_longer_than_window_resets_every_bucket(self) -> None:
+        for now_ms in range(0, 6_000, 500):
+            self.window.record(now_ms)
+        self.assertEqual(self.window.count(5_999), 12)
+        self.assertEqual(self.window.count(60_000), 0)
+        self.assertEqual(self.window.buckets, [0] * 6)
+        self.window.record(60_100)
+        self.window.record(61_200)
+        self.assertEqual(self.window.count(61_300), 2)
+        self.assertEqual(self.window.count(66_000), 1)
+        self.assertTotalMatchesBuckets()
+
+    def test_gap_of_exactly_one_window_clears_everything(self) -> None:
+        self.window.record(2_000)
+        self.window.record(2_999)
+        self.assertEqual(self.window.count(8_000), 0)
+        self.assertTotalMatchesBuckets()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,13 +5,12 @@ import re
 from typing import Iterable
 
 HYPE_TOKENS = {"POG", "POGGERS", "OMEGALUL", "LUL", "KEKW", "W", "HYPE"}
+_WHITESPACE_RE = re.compile(r"\s+")
 
 
 def sanitize_text(value: str) -> str:
-    sanitized = value.replace("\n", " ").replace("\r", " ")
-    sanitized = re.sub(r"\s+", " ", sanitized)
-    sanitized = sanitized.strip()
-    return sanitized
+    # \s already covers \n and \r, so one substitution collapses all line breaks and runs.
+    return _WHITESPACE_RE.sub(" ", value).strip()
 
 
 def strip_mentions(value: str) -> str:
@@ -28,8 +27,9 @@ def truncate(value: str, max_chars: int) -> str:
     return value[: max_chars - 1] + "…"
 
 
-def detect_mentions(content: str, display_name: str) -> bool:
-    lowered = content.lower()
+def detect_mentions(content: str, display_name: str, lowered: str | None = None) -> bool:
+    if lowered is None:
+        lowered = content.lower()
     tokens = [display_name.lower()] if display_name else []
     if display_name and not display_name.startswith("@"):
         tokens.append(f"@{display_name.lower()}")
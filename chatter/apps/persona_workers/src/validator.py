@@ -1,18 +1,30 @@
 import json
 from pathlib import Path
+from typing import Callable
 
 from jsonschema import Draft202012Validator
 
+try:  # Optional speedup; containers install fastjsonschema
+    import fastjsonschema
+except ImportError:  # pragma: no cover - falls back to jsonschema
+    fastjsonschema = None
+
 
 class JSONSchemaValidator:
+    # Bound per instance to the fastest available check, so validate() is a single call.
+    validate: Callable[[dict], None]
+
     def __init__(self, schema_path: Path) -> None:
         with schema_path.open("r", encoding="utf-8") as f:
             schema = json.load(f)
         Draft202012Validator.check_schema(schema)
         self.validator = Draft202012Validator(schema)
-
-    def validate(self, data: dict) -> None:
-        self.validator.validate(data)
+        self.validate = self.validator.validate
+        if fastjsonschema is not None:
+            try:
+                self.validate = fastjsonschema.compile(schema, use_default=False, use_formats=False)
+            except Exception:  # noqa: BLE001
+                pass
 
 
 class ChatMessageValidator(JSONSchemaValidator):
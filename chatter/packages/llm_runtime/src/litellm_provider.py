@@ -17,6 +17,16 @@ def _clean_text(text: str, max_chars: int) -> str:
     return single_line
 
 
+def _with_cache_control(message: Dict[str, Any]) -> Dict[str, Any]:
+    content = message.get("content") or ""
+    if not isinstance(content, str):
+        return message
+    return {
+        "role": message.get("role", "system"),
+        "content": [{"type": "text", "text": content, "cache_control": {"type": "ephemeral"}}],
+    }
+
+
 class LiteLLMProvider(LLMProvider):
     def __init__(self, config: Dict[str, Any], provider_name: str = "litellm") -> None:
         self.config = config
@@ -25,6 +35,7 @@ class LiteLLMProvider(LLMProvider):
         if not self.model:
             raise ValueError("LiteLLMProvider requires litellm.model")
         self.max_output_chars = int(config.get("max_output_chars", 200))
+        self.prompt_cache = bool(config.get("litellm", {}).get("prompt_cache", False))
 
     def _request_kwargs(self) -> Dict[str, Any]:
         litellm_cfg = self.config.get("litellm", {})
@@ -61,8 +72,15 @@ class LiteLLMProvider(LLMProvider):
         return ""
 
     def generate(self, req: LLMRequest) -> LLMResponse:
+        system_message = {"role": "system", "content": req.system_prompt or ""}
+        memory_messages = req.memory_messages
+        if self.prompt_cache:
+            # Breakpoints after the static system prompt and the slower-changing memory block.
+            system_message = _with_cache_control(system_message)
+            memory_messages = [_with_cache_control(message) for message in memory_messages]
         messages = [
-            {"role": "system", "content": req.system_prompt or ""},
+            system_message,
+            *memory_messages,
             {"role": "user", "content": req.user_prompt or req.content},
         ]
         kwargs = self._request_kwargs()
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 from .hash_utils import canonical_prompt_text
 from .prompt_loader import load_prompt_manifest, verify_prompt_files, verify_sha256
@@ -58,7 +58,6 @@ class PromptRenderer:
     def render_persona_reply(self, req: LLMRequest, prompt_id: str | None = None) -> Tuple[str, str]:
         recent_block = self._format_recent(req.recent_messages)
         policy_tags = json.dumps(req.tags or {}, sort_keys=True)
-        memory_block = req.memory_context or "None"
         observation_block = req.observation_context or "None"
         observation_summary = req.observation_summary or "None"
         persona_profile = req.persona_profile or "None"
@@ -75,13 +74,15 @@ class PromptRenderer:
             "OBSERVATION_SUMMARY:\n"
             f"{observation_summary}\n"
             "STREAM_OBSERVATIONS:\n"
-            f"{observation_block}\n"
-            "MEMORY_CONTEXT:\n"
-            f"{memory_block}"
+            f"{observation_block}"
         )
         system_prompt = self._resolve_prompt_text("persona_reply", prompt_id)
         return system_prompt, user_prompt
 
+    def render_memory_messages(self, req: LLMRequest) -> List[Dict[str, str]]:
+        memory_block = req.memory_context or "None"
+        return [{"role": "system", "content": f"MEMORY_CONTEXT:\n{memory_block}"}]
+
     def render_persona_auto_commentary(
         self, req: LLMRequest, prompt_id: str | None = None
     ) -> Tuple[str, str]:
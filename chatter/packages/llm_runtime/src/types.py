@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 
 @dataclass
@@ -20,6 +20,7 @@ class LLMRequest:
     prompt_id: Optional[str] = None
     system_prompt: str = ""
     user_prompt: str = ""
+    memory_messages: List[Dict[str, Any]] = field(default_factory=list)
 
 
 @dataclass
@@ -1,5 +1,12 @@
 from .types import MemoryItem, MemoryQueryResult, MemoryStore
-from .policy import load_memory_policy, is_category_allowed, is_scope_allowed, should_store_item
+from .policy import (
+    CompiledMemoryPolicy,
+    compile_memory_policy,
+    load_memory_policy,
+    is_category_allowed,
+    is_scope_allowed,
+    should_store_item,
+)
 from .validate import validate_memory_item_dict, validate_memory_stub_fixtures, load_schema
 from .store_stub import StubMemoryStore
 from .mem0_store import Mem0MemoryStore
@@ -11,6 +18,8 @@ __all__ = [
     "MemoryItem",
     "MemoryQueryResult",
     "MemoryStore",
+    "CompiledMemoryPolicy",
+    "compile_memory_policy",
     "load_memory_policy",
     "is_category_allowed",
     "is_scope_allowed",
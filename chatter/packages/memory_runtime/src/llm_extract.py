@@ -6,9 +6,14 @@ from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Tuple
 
+try:  # Optional speedup for parsing model output
+    import orjson
+except ImportError:  # pragma: no cover - falls back to stdlib json
+    orjson = None
+
 from packages.llm_runtime.src import LLMProvider, LLMRequest, PromptRenderer
 
-from .policy import should_store_item
+from .policy import compile_memory_policy
 from .redaction import apply_redactions
 from .types import MemoryItem
 from .validate import validate_memory_item_dict
@@ -39,6 +44,7 @@ class LLMMemoryExtractor:
         self.provider = provider
         self.renderer = renderer
         self.policy = policy or {}
+        self.policy_rules = compile_memory_policy(self.policy)
         self.max_items = max_items
         self.max_chars = max_chars
         self.scope_user_enabled = scope_user_enabled
@@ -84,7 +90,7 @@ class LLMMemoryExtractor:
 
         def _parse(candidate: str) -> Tuple[List[Dict], str | None]:
             try:
-                parsed = json.loads(candidate)
+                parsed = orjson.loads(candidate) if orjson is not None else json.loads(candidate)
             except Exception:
                 return [], "json_parse_failed"
 
@@ -259,7 +265,7 @@ class LLMMemoryExtractor:
                 result.error = str(exc)
                 continue
 
-            allowed, reason = should_store_item(self.policy, normalized)
+            allowed, reason = self.policy_rules.should_store(normalized)
             if not allowed:
                 result.rejected_count += 1
                 result.error = reason
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import io
 import json
 import logging
 import re
@@ -59,6 +60,7 @@ class Mem0Client:
         app_id: str | None = None,
         org_id: str | None = None,
         project_id: str | None = None,
+        http_client: Any | None = None,
     ) -> None:
         self.api_key = api_key
         self.base_url = _normalize_base_url(base_url)
@@ -69,6 +71,7 @@ class Mem0Client:
         self.app_id = (app_id or "").strip() or None
         self.org_id = org_id
         self.project_id = project_id
+        self.http_client = http_client
 
     def _headers(self) -> Dict[str, str]:
         return {
@@ -81,6 +84,8 @@ class Mem0Client:
         if payload is None and method.upper() in {"POST", "PUT", "PATCH"}:
             payload = {}
         data = json.dumps(payload or {}).encode("utf-8") if payload is not None else None
+        if self.http_client is not None:
+            return self._request_pooled(method, url, data)
         req = urllib.request.Request(url, data=data, headers=self._headers(), method=method)
         try:
             with urllib.request.urlopen(req, timeout=self.timeout_s) as resp:  # noqa: S310
@@ -93,6 +98,21 @@ class Mem0Client:
             logger.debug("mem0 http error %s: %s", exc.code, text)
             raise
 
+    def _request_pooled(self, method: str, url: str, data: bytes | None) -> Dict[str, Any]:
+        # Mirror urlopen: follow redirects and surface failures as urllib.error.HTTPError.
+        resp = self.http_client.request(
+            method, url, content=data, headers=self._headers(), timeout=self.timeout_s, follow_redirects=True
+        )
+        if resp.status_code >= 400:
+            logger.debug("mem0 http error %s: %s", resp.status_code, resp.text)
+            raise urllib.error.HTTPError(
+                url, resp.status_code, resp.reason_phrase, resp.headers, io.BytesIO(resp.content)
+            )
+        body = resp.content
+        if not body:
+            return {}
+        return json.loads(body.decode("utf-8"))
+
     def _normalize_add_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         enriched = dict(payload)
         raw_filters = enriched.pop("filters", None)
@@ -221,6 +221,9 @@ class Mem0MemoryStore(MemoryStore):
         if created_id:
             logger.debug("mem0 upsert created id %s for scope %s", created_id, scope_key)
 
+    def bucket_key(self, scope_key: str) -> str:
+        return _bucket_key_from_scope(scope_key)
+
     def dump(self) -> Dict[str, List[MemoryItem]]:
         return self._store
 
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import json
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, FrozenSet, Tuple
 
 from jsonschema import Draft202012Validator
 
@@ -45,41 +46,70 @@ def is_scope_allowed(policy: Dict, scope: str) -> bool:
     return bool(scope) and scope in scopes
 
 
-def should_store_item(policy: Dict, item: Dict) -> Tuple[bool, str]:
-    if not policy.get("enabled", False):
-        return False, "policy_disabled"
+@dataclass(frozen=True)
+class CompiledMemoryPolicy:
+    """Policy fields pre-extracted once so per-item checks avoid dict lookups."""
+
+    enabled: bool
+    scopes: FrozenSet[str]
+    allow_categories: FrozenSet[str]
+    deny_categories: FrozenSet[str]
+    min_confidence: float
+    ttl_days_default: int | None
+
+    def should_store(self, item: Dict) -> Tuple[bool, str]:
+        if not self.enabled:
+            return False, "policy_disabled"
 
-    scope = item.get("scope")
-    if not is_scope_allowed(policy, scope):
-        return False, "scope_not_allowed"
+        scope = item.get("scope")
+        if not scope or scope not in self.scopes:
+            return False, "scope_not_allowed"
 
-    category = item.get("category", "")
-    if not is_category_allowed(policy, category):
-        if category in policy.get("deny_categories", []):
+        category = item.get("category", "")
+        if not category:
+            return False, "category_not_allowed"
+        if category in self.deny_categories:
             return False, "category_denied"
-        return False, "category_not_allowed"
-
-    confidence = item.get("confidence", 0)
-    min_conf = policy.get("write_rules", {}).get("min_confidence", 0)
-    if confidence < min_conf:
-        return False, "low_confidence"
-
-    ttl_days = item.get("ttl_days")
-    ttl_default = policy.get("ttl_days_default")
-    if ttl_days is None:
-        if ttl_default is None:
-            return False, "ttl_missing"
-        item["ttl_days"] = ttl_default
-    else:
-        if ttl_days < 1:
-            return False, "ttl_invalid"
-        if ttl_default is not None and ttl_days > ttl_default:
+        if self.allow_categories and category not in self.allow_categories:
+            return False, "category_not_allowed"
+
+        if item.get("confidence", 0) < self.min_confidence:
+            return False, "low_confidence"
+
+        ttl_days = item.get("ttl_days")
+        ttl_default = self.ttl_days_default
+        if ttl_days is None:
+            if ttl_default is None:
+                return False, "ttl_missing"
             item["ttl_days"] = ttl_default
+        else:
+            if ttl_days < 1:
+                return False, "ttl_invalid"
+            if ttl_default is not None and ttl_days > ttl_default:
+                item["ttl_days"] = ttl_default
 
-    return True, "ok"
+        return True, "ok"
+
+
+def compile_memory_policy(policy: Dict) -> CompiledMemoryPolicy:
+    return CompiledMemoryPolicy(
+        enabled=bool(policy.get("enabled", False)),
+        scopes=frozenset(policy.get("scopes") or []),
+        allow_categories=frozenset(policy.get("allow_categories") or []),
+        deny_categories=frozenset(policy.get("deny_categories", [])),
+        min_confidence=policy.get("write_rules", {}).get("min_confidence", 0),
+        ttl_days_default=policy.get("ttl_days_default"),
+    )
+
+
+def should_store_item(policy: Dict, item: Dict) -> Tuple[bool, str]:
+    # One-off check against a raw policy dict; long-lived callers should compile once and reuse.
+    return compile_memory_policy(policy).should_store(item)
 
 
 __all__ = [
+    "CompiledMemoryPolicy",
+    "compile_memory_policy",
     "load_memory_policy",
     "is_category_allowed",
     "is_scope_allowed",
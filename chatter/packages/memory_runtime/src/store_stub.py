@@ -42,24 +42,31 @@ def _parse_ts(ts: str) -> datetime:
     return datetime.min
 
 
-def _score_item(item: MemoryItem, query: str) -> Tuple[int, datetime, str]:
-    tokens = [tok for tok in re.split(r"\W+", query.lower().strip()) if tok]
-    if not tokens:
-        tokens = []
+def _query_tokens(query: str) -> List[str]:
+    return [tok for tok in re.split(r"\W+", query.lower().strip()) if tok]
+
+
+def _score_item(item: MemoryItem, query: str, tokens: List[str] | None = None) -> Tuple[int, datetime, str]:
+    if tokens is None:
+        tokens = _query_tokens(query)
     score = 0
     subject_l = item.subject.lower()
     value_l = item.value.lower()
     category_l = item.category.lower()
-    for tok in tokens or [""]:
-        if tok and tok in subject_l:
+    for tok in tokens:
+        if tok in subject_l:
             score += 3
-        if tok and tok in value_l:
+        if tok in value_l:
             score += 2
-        if tok and tok in category_l:
+        if tok in category_l:
             score += 1
     return score, _parse_ts(item.ts), item.id
 
 
+def _rank_key(entry: Tuple[int, datetime, str, MemoryItem]) -> Tuple[int, float, str]:
+    return -entry[0], -entry[1].timestamp(), entry[2]
+
+
 class StubMemoryStore(MemoryStore):
     def __init__(self, fixtures_path: Path | None = None):
         self._store: Dict[str, List[MemoryItem]] = {}
@@ -77,18 +84,30 @@ class StubMemoryStore(MemoryStore):
                 self._store.setdefault(persona_id, []).append(item)
 
     def search(self, scope_key: str, query: str, limit: int = 5) -> MemoryQueryResult:
-        matches: List[Tuple[int, datetime, str, MemoryItem]] = []
+        return self.search_many([scope_key], query, limit=limit)
+
+    def search_many(self, scope_keys: List[str], query: str, limit: int = 5) -> MemoryQueryResult:
+        # Single pass over the store; each scope is ranked on its own and results keep scope_keys order.
+        order = {scope_key: idx for idx, scope_key in enumerate(dict.fromkeys(scope_keys))}
+        buckets: List[List[Tuple[int, datetime, str, MemoryItem]]] = [[] for _ in order]
+        tokens = _query_tokens(query)
         for persona_items in self._store.values():
             for item in persona_items:
-                if item.scope_key != scope_key:
+                idx = order.get(item.scope_key)
+                if idx is None:
                     continue
-                score, ts_parsed, item_id = _score_item(item, query)
+                score, ts_parsed, item_id = _score_item(item, query, tokens)
                 if score > 0:
-                    matches.append((score, ts_parsed, item_id, item))
-
-        matches.sort(key=lambda tup: (-tup[0], -tup[1].timestamp(), tup[2]))
-        limited = [entry[3] for entry in matches[:limit]]
-        meta = {"returned": len(limited), "matched": len(matches)}
+                    buckets[idx].append((score, ts_parsed, item_id, item))
+
+        limited: List[MemoryItem] = []
+        matched = 0
+        for matches in buckets:
+            matched += len(matches)
+            matches.sort(key=_rank_key)
+            limited.extend(entry[3] for entry in matches[:limit])
+        limited = limited[:limit]
+        meta = {"returned": len(limited), "matched": matched}
         return MemoryQueryResult(items=limited, meta=meta)
 
     def upsert(self, scope_key: str, item: MemoryItem) -> None:
@@ -103,6 +122,9 @@ class StubMemoryStore(MemoryStore):
         else:
             bucket.append(item)
 
+    def bucket_key(self, scope_key: str) -> str:
+        return _persona_key_from_scope(scope_key)
+
     def dump(self) -> Dict[str, List[MemoryItem]]:
         return self._store
 
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import unittest
+import urllib.error
 from unittest import mock
 
 from .mem0_client import Mem0Client, _normalize_base_url
@@ -156,6 +157,55 @@ class Mem0ClientRequestTests(unittest.TestCase):
         self.assertTrue(str(captured.get("url", "")).endswith("/v2/memories/search/"))
         self.assertEqual(decoded.get("filters", {}).get("app_id"), "my_app")
 
+    def test_shared_http_client_is_used_instead_of_urlopen(self) -> None:
+        captured = {}
+
+        class Resp:
+            status_code = 200
+            content = b"{}"
+
+        class FakeHttpClient:
+            def request(self_inner, method, url, content=None, headers=None, timeout=None, follow_redirects=False):
+                captured["method"] = method
+                captured["url"] = url
+                captured["data"] = content
+                captured["timeout"] = timeout
+                captured["follow_redirects"] = follow_redirects
+                return Resp()
+
+        client = Mem0Client(api_key="dummy", base_url="https://api.mem0.ai/", timeout_s=7, http_client=FakeHttpClient())
+        with mock.patch("urllib.request.urlopen") as urlopen:
+            result = client.search_memories({"query": "hello", "agent_id": "abc"})
+            urlopen.assert_not_called()
+
+        self.assertEqual(result, {})
+        self.assertEqual(captured["method"], "POST")
+        self.assertEqual(captured["timeout"], 7)
+        self.assertTrue(captured["follow_redirects"])
+        self.assertTrue(captured["url"].endswith("/v2/memories/search/"))
+        decoded = json.loads(captured["data"].decode("utf-8"))
+        self.assertEqual(decoded.get("filters", {}).get("agent_id"), "abc")
+
+    def test_shared_http_client_error_status_raises_http_error(self) -> None:
+        class Resp:
+            status_code = 503
+            reason_phrase = "Service Unavailable"
+            headers = {"Content-Type": "application/json"}
+            content = b'{"detail": "down"}'
+            text = '{"detail": "down"}'
+
+        class FakeHttpClient:
+            def request(self_inner, method, url, **kwargs):
+                return Resp()
+
+        client = Mem0Client(api_key="dummy", base_url="https://api.mem0.ai/", http_client=FakeHttpClient())
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            client.search_memories({"query": "hello", "agent_id": "abc"})
+
+        self.assertEqual(ctx.exception.code, 503)
+        self.assertTrue(ctx.exception.url.endswith("/v2/memories/search/"))
+        self.assertEqual(json.loads(ctx.exception.read().decode("utf-8")), {"detail": "down"})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import unittest
+
+from .policy import compile_memory_policy, should_store_item
+
+POLICY = {
+    "enabled": True,
+    "scopes": ["persona", "persona_room"],
+    "allow_categories": ["room_lore", "stream_fact"],
+    "deny_categories": ["secret"],
+    "write_rules": {"min_confidence": 0.5},
+    "ttl_days_default": 30,
+}
+
+
+def _item(**overrides) -> dict:
+    item = {"scope": "persona_room", "category": "room_lore", "confidence": 0.9, "ttl_days": 7}
+    item.update(overrides)
+    return item
+
+
+class MemoryPolicyTests(unittest.TestCase):
+    def test_rejection_reasons(self) -> None:
+        cases = [
+            ({**POLICY, "enabled": False}, _item(), "policy_disabled"),
+            (POLICY, _item(scope="global"), "scope_not_allowed"),
+            (POLICY, _item(category="secret"), "category_denied"),
+            (POLICY, _item(category="other"), "category_not_allowed"),
+            (POLICY, _item(category=""), "category_not_allowed"),
+            (POLICY, _item(confidence=0.1), "low_confidence"),
+            (POLICY, _item(ttl_days=0), "ttl_invalid"),
+            ({**POLICY, "ttl_days_default": None}, _item(ttl_days=None), "ttl_missing"),
+        ]
+        for policy, item, reason in cases:
+            with self.subTest(reason=reason):
+                self.assertEqual(should_store_item(policy, item), (False, reason))
+
+    def test_ttl_is_defaulted_and_clamped(self) -> None:
+        rules = compile_memory_policy(POLICY)
+        missing = _item(ttl_days=None)
+        self.assertEqual(rules.should_store(missing), (True, "ok"))
+        self.assertEqual(missing["ttl_days"], 30)
+        too_long = _item(ttl_days=90)
+        self.assertEqual(should_store_item(POLICY, too_long), (True, "ok"))
+        self.assertEqual(too_long["ttl_days"], 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
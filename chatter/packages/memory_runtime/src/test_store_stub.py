@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import unittest
+
+from .store_stub import StubMemoryStore
+from .types import MemoryItem
+
+
+def _make_item(item_id: str, scope_key: str, value: str, ts: str = "2024-01-01T00:00:00Z") -> MemoryItem:
+    return MemoryItem(
+        id=item_id,
+        ts=ts,
+        scope=scope_key.split(":", 1)[0],
+        scope_key=scope_key,
+        category="room_lore",
+        subject="room",
+        value=value,
+        confidence=0.5,
+        ttl_days=30,
+        source={"kind": "manual", "message_id": None, "user_id": None, "origin": "system"},
+    )
+
+
+class StubStoreSearchManyTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.room_key = "persona_room:room:demo:Alice"
+        self.persona_key = "persona:Alice"
+        self.store = StubMemoryStore()
+        self.store.upsert(self.room_key, _make_item("room000001", self.room_key, "tacos forever"))
+        self.store.upsert(
+            self.room_key, _make_item("room000002", self.room_key, "tacos and nachos", ts="2024-02-01T00:00:00Z")
+        )
+        self.store.upsert(self.persona_key, _make_item("pers000001", self.persona_key, "loves tacos"))
+        self.store.upsert(self.persona_key, _make_item("pers000002", self.persona_key, "unrelated"))
+
+    def test_search_many_keeps_scope_order_and_caps_the_total(self) -> None:
+        # Both room items score the same for "tacos"; the newer one ranks first.
+        room_then_persona = [self.room_key, self.persona_key]
+        cases = [
+            (room_then_persona, 1, ["room000002"]),
+            (room_then_persona, 2, ["room000002", "room000001"]),
+            (room_then_persona, 3, ["room000002", "room000001", "pers000001"]),
+            (room_then_persona, 5, ["room000002", "room000001", "pers000001"]),
+            ([self.persona_key, self.room_key], 2, ["pers000001", "room000002"]),
+        ]
+        for scope_keys, limit, expected_ids in cases:
+            with self.subTest(scope_keys=scope_keys, limit=limit):
+                result = self.store.search_many(scope_keys, "tacos", limit=limit)
+                self.assertEqual([item.id for item in result.items], expected_ids)
+
+    def test_search_many_ranks_within_scope(self) -> None:
+        result = self.store.search_many([self.room_key], "tacos nachos", limit=5)
+        self.assertEqual([item.id for item in result.items], ["room000002", "room000001"])
+        self.assertEqual(result.meta, {"returned": 2, "matched": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
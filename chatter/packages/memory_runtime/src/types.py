@@ -40,8 +40,18 @@ class MemoryStore(Protocol):
     def search(self, scope_key: str, query: str, limit: int = 5) -> MemoryQueryResult:
         ...
 
+    def search_many(self, scope_keys: List[str], query: str, limit: int = 5) -> MemoryQueryResult:
+        items: List[MemoryItem] = []
+        for scope_key in scope_keys:
+            items.extend(self.search(scope_key, query, limit=limit).items)
+        return MemoryQueryResult(items=items[:limit], meta={"returned": min(len(items), limit)})
+
     def upsert(self, scope_key: str, item: MemoryItem) -> None:
         ...
 
+    def bucket_key(self, scope_key: str) -> str:
+        # Upserts replace an existing item with the same id within this bucket.
+        ...
+
     def dump(self) -> Dict[str, List[MemoryItem]]:
         ...